@@ -61,12 +61,13 @@ def _plot_vw_matplotlib(filename, v, w, values, best_vw=None, lune_array=None,
 
     fig, ax = pyplot.subplots(figsize=figsize, constrained_layout=True)
 
-    # pcolor requires corners of pixels
+    # pcolormesh requires corners of pixels
     corners_v = _centers_to_edges(v)
     corners_w = _centers_to_edges(w)
 
     # `values` gets mapped to pixel colors
-    pyplot.pcolor(corners_v, corners_w, values, cmap=colormap)
+    pyplot.pcolormesh(corners_v, corners_w, values, cmap=colormap,
+        rasterized=True)
 
     # v and w have the following bounds
     # (see https://doi.org/10.1093/gji/ggv262)
@@ -176,11 +177,15 @@ def _add_marker(axis, coords):
 
 
 def _pcolor(axis, x, y, values, colormap, **kwargs):
+    # a single QuadMesh is much cheaper to draw and save than the per-pixel
+    # polygons created by pcolor
+    kwargs.setdefault('rasterized', True)
+
     # workaround matplotlib compatibility issue
     try:
-        axis.pcolor(x, y, values, cmap=colormap, shading='auto', **kwargs)
+        axis.pcolormesh(x, y, values, cmap=colormap, shading='auto', **kwargs)
     except:
-        axis.pcolor(x, y, values, cmap=colormap, **kwargs)
+        axis.pcolormesh(x, y, values, cmap=colormap, **kwargs)
 
 
 def _set_dc_labels(axes, **kwargs):
@@ -152,30 +152,22 @@ def _plot_depth(filename, da, origins, title='',
 
     """
 
-    npts = len(origins)
+    depths = np.array([origin.depth_in_m for origin in origins], dtype=float)
 
-    depths = np.empty(npts)
-    values = np.empty(npts)
-    for _i, origin in enumerate(origins):
-        depths[_i] = origin.depth_in_m
-        values[_i] = da.values[_i]
+    # the best-fitting source at each depth is given by coordinate arrays
+    # along origin_idx, so values, magnitudes and tradeoffs are taken from
+    # those arrays rather than by indexing the DataArray one origin at a time
+    values = np.array(da.values, dtype=float)
 
     magnitudes = None
     if show_magnitudes:
-        magnitudes = np.empty(npts)
-        for _i in range(npts):
-            magnitudes[_i] = to_Mw(da[_i].coords['rho'])
+        magnitudes = to_Mw(np.asarray(da.coords['rho'].values, dtype=float))
 
     lune_array = None
     if show_tradeoffs:
-        lune_array = np.empty((npts, 6))
-        for _i in range(npts):
-            lune_array[_i, 0] = da[_i].coords['rho']
-            lune_array[_i, 1] = da[_i].coords['v']
-            lune_array[_i, 2] = da[_i].coords['w']
-            lune_array[_i, 3] = da[_i].coords['kappa']
-            lune_array[_i, 4] = da[_i].coords['sigma']
-            lune_array[_i, 5] = da[_i].coords['h']
+        lune_array = np.column_stack([
+            np.asarray(da.coords[key].values, dtype=float)
+            for key in ('rho', 'v', 'w', 'kappa', 'sigma', 'h')])
 
     if xlabel=='auto' and (depths.max() < 10000.):
        xlabel = 'Depth (m)'
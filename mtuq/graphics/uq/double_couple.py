@@ -161,7 +161,7 @@ def plot_variance_reduction_dc(filename, ds, data_norm, **kwargs):
     _check(ds)
 
     if issubclass(type(ds), DataArray):
-        variance_reduction = _variance_reduction_dc_regular(ds, var)
+        variance_reduction = _variance_reduction_dc_regular(ds, data_norm)
 
     elif issubclass(type(ds), DataFrame):
         warn('plot_variance_reduction_dc() not implemented for irregularly-spaced grids.\n'
@@ -212,14 +212,14 @@ def _plot_dc(filename, da, show_best=True, colormap='hot',
 
     # squeeze full 3-D array into 2-D arrays
     if squeeze=='min':
-        values_h_kappa = da.min(dim=('sigma')).values
-        values_sigma_kappa = da.min(dim=('h')).values
-        values_sigma_h = da.min(dim=('kappa')).values.T
+        values_h_kappa = da.min(dim=('sigma'), skipna=False).values
+        values_sigma_kappa = da.min(dim=('h'), skipna=False).values
+        values_sigma_h = da.min(dim=('kappa'), skipna=False).values.T
 
     elif squeeze=='max':
-        values_h_kappa = da.max(dim=('sigma')).values
-        values_sigma_kappa = da.max(dim=('h')).values
-        values_sigma_h = da.max(dim=('kappa')).values.T
+        values_h_kappa = da.max(dim=('sigma'), skipna=False).values
+        values_sigma_kappa = da.max(dim=('h'), skipna=False).values
+        values_sigma_h = da.max(dim=('kappa'), skipna=False).values.T
 
     elif squeeze=='slice_min':
         argmin = da.argmin(('kappa','sigma','h'))
@@ -253,28 +253,49 @@ def _plot_dc(filename, da, show_best=True, colormap='hot',
 def _misfit_dc_regular(da):
     """ For each moment tensor orientation, extract minimum misfit
     """
-    misfit = da.min(dim=('origin_idx', 'rho', 'v', 'w'))
+    misfit = da.min(dim=('origin_idx', 'rho', 'v', 'w'), skipna=False)
+
+    best_mt, best_dc = _min_mt_and_dc(da)
 
     return misfit.assign_attrs({
-        'best_mt': _min_mt(da),
-        'best_dc': _min_dc(da),
+        'best_mt': best_mt,
+        'best_dc': best_dc,
         })
 
 
 def _likelihoods_dc_regular(da, var):
     """ For each moment tensor orientation, calculate maximum likelihood
     """
-    likelihoods = da.copy()
-    likelihoods.values = np.exp(-likelihoods.values/(2.*var))
-    likelihoods.values /= likelihoods.values.sum()
+    if np.ndim(var)==0:
+        # because exp(-x) decreases monotonically, maximum likelihood
+        # corresponds to minimum misfit, so for a scalar variance we can
+        # reduce first and exponentiate only the much smaller result
+        misfit = da.min(dim=('origin_idx', 'rho', 'v', 'w'), skipna=False)
+
+        # subtracting the minimum misfit prevents underflow, and its effect
+        # cancels out under normalization
+        likelihoods = misfit.copy()
+        likelihoods.values = np.exp(
+            -(misfit.values - misfit.values.min())/(2.*var))
+
+    else:
+        # an array-valued variance can vary over the grid, so likelihoods
+        # must be evaluated everywhere before reducing
+        likelihoods = da.copy()
+        likelihoods.values = np.exp(-likelihoods.values/(2.*var))
+        likelihoods.values /= likelihoods.values.sum()
+
+        likelihoods = likelihoods.max(
+            dim=('origin_idx', 'rho', 'v', 'w'), skipna=False)
 
-    likelihoods = likelihoods.max(dim=('origin_idx', 'rho', 'v', 'w'))
     likelihoods.values /= likelihoods.values.sum()
     #likelihoods /= dc_area
 
+    best_mt, best_dc = _min_mt_and_dc(da)
+
     return likelihoods.assign_attrs({
-        'best_mt': _min_mt(da),
-        'best_dc': _min_dc(da),
+        'best_mt': best_mt,
+        'best_dc': best_dc,
         'maximum_likelihood_estimate': dataarray_idxmax(likelihoods).values(),
         })
 
@@ -286,7 +307,8 @@ def _marginals_dc_regular(da, var):
     likelihoods.values = np.exp(-likelihoods.values/(2.*var))
     likelihoods.values /= likelihoods.values.sum()
 
-    marginals = likelihoods.sum(dim=('origin_idx', 'rho', 'v', 'w'))
+    marginals = likelihoods.sum(
+        dim=('origin_idx', 'rho', 'v', 'w'), skipna=False)
     marginals.values /= marginals.values.sum()
 
     return marginals.assign_attrs({
@@ -297,18 +319,18 @@ def _marginals_dc_regular(da, var):
 def _variance_reduction_dc_regular(da, data_norm):
     """ For each moment tensor orientation, extracts maximum variance reduction
     """
-    variance_reduction = 1. - da.copy()/data_norm
-
-    variance_reduction = variance_reduction.max(
-        dim=('origin_idx', 'rho', 'v', 'w'))
+    # maximum variance reduction corresponds to minimum misfit, so we can
+    # reduce first and transform only the much smaller result
+    misfit = da.min(dim=('origin_idx', 'rho', 'v', 'w'), skipna=False)
 
     # widely-used convention - variance reducation as a percentage
-    variance_reduction.values *= 100.
+    variance_reduction = 100.*(1. - misfit/data_norm)
+
+    best_mt, best_dc = _min_mt_and_dc(da)
 
     return variance_reduction.assign_attrs({
-        'best_mt': _min_mt(da),
-        'best_dc': _min_dc(da),
-        'lune_array': _lune_array(da),
+        'best_mt': best_mt,
+        'best_dc': best_dc,
         })
 
 
@@ -316,13 +338,15 @@ def _variance_reduction_dc_regular(da, data_norm):
 # utility functions
 #
 
-def _min_mt(da):
-    """ Returns moment tensor vector corresponding to minimum DataArray value
+def _min_mt_and_dc(da):
+    """ Returns moment tensor vector and orientation angles corresponding to
+    minimum DataArray value
     """
+    # a single pass over the full grid suffices for both
     da = dataarray_idxmin(da)
     lune_keys = ['rho', 'v', 'w', 'kappa', 'sigma', 'h']
     lune_vals = [da[key].values for key in lune_keys]
-    return to_mij(*lune_vals)
+    return to_mij(*lune_vals), lune_vals[3:]
 
 
 def _max_mt(da):
@@ -334,14 +358,6 @@ def _max_mt(da):
     return to_mij(*lune_vals)
 
 
-def _min_dc(da):
-    """ Returns orientation angles corresponding to minimum DataArray value
-    """
-    da = dataarray_idxmin(da)
-    dc_keys = ['kappa', 'sigma', 'h']
-    dc_vals = [da[key].values for key in dc_keys]
-    return dc_vals
-
 def _max_dc(da):
     """ Returns orientation angles corresponding to maximum DataArray value
     """
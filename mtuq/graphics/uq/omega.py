@@ -10,7 +10,7 @@ from mtuq import Force, MomentTensor
 from mtuq.graphics.uq._matplotlib import _plot_omega_matplotlib
 from mtuq.grid_search import DataArray, DataFrame
 from mtuq.util import warn
-from mtuq.util.math import to_mij
+from mtuq.util.math import to_mij_batch
 from pandas import DataFrame
 
 
@@ -251,7 +251,7 @@ def _to_array(df):
     df = df.reset_index()
 
     try:
-        return np.ascontiguousarray(to_mij(
+        return np.ascontiguousarray(to_mij_batch(
             df['rho'].to_numpy(),
             df['v'].to_numpy(),
             df['w'].to_numpy(),
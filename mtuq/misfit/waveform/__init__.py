@@ -107,6 +107,15 @@ class WaveformMisfit(object):
       discretization.
 
 
+    In addition, ``mtuq.misfit.waveform.level0_fast`` follows the same
+    trace-by-trace approach as ``level0``, but does per-station setup only
+    once, sums residuals with Numba (if installed), and can optionally
+    evaluate stations in parallel threads (``nthreads``) or cross-correlate
+    in single precision (``dtype``). It is not selected by
+    ``optimization_level``, but can be called directly in place of
+    ``level0.misfit``.
+
+
     .. note:: 
 
       During installation, C extension modules are automatically compiled by
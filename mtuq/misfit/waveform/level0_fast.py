@@ -0,0 +1,423 @@
+"""
+Waveform misfit module (fast trace-by-trace Python version)
+
+See ``mtuq/misfit/waveform/__init__.py`` for more information
+"""
+
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from scipy.fft import irfft, next_fast_len, rfft
+from mtuq.misfit.waveform._stats import _flatten, calculate_norm_data
+from mtuq.util import AttribDict, exists_numba
+from mtuq.util.math import isclose, list_intersect_with_indices, prefer_fft
+from mtuq.util.signal import get_components, get_time_sampling
+
+
+def misfit(data, greens, sources, norm, time_shift_groups,
+    time_shift_min, time_shift_max, msg_handle, 
+    normalize=False, set_attributes=False, nthreads=1, dtype=np.float64):
+    """
+    Waveform misfit function (fast trace-by-trace Python version)
+
+    See ``mtuq/misfit/waveform/__init__.py`` for more information
+    """
+    values = np.zeros((len(sources), 1))
+
+    if normalize:
+        components = _flatten(time_shift_groups)
+        norm_data = calculate_norm_data(data, norm, components)
+
+    residual_norm = _residual_norms[norm]
+
+    #
+    # initialize Green's function machinery
+    #
+    stations = []
+    for _j, d in enumerate(data):
+        greens[_j]._set_components(get_components(d))
+
+        # time sampling, data arrays, FFTs and so on are the same for every
+        # source, so compute them once
+        stations += [_prepare(d, time_shift_groups,
+            time_shift_min, time_shift_max, dtype)]
+
+    #
+    # misfit contribution from a single station, which can be evaluated
+    # independently of all other stations
+    #
+    def misfit_station(source, _j):
+        d = data[_j]
+        station = stations[_j]
+
+        if not greens[_j].components:
+            return 0.
+
+        # generate synthetics
+        s = greens[_j].get_synthetics(source, inplace=True)
+
+        # numeric trace data (synthetics are copied only if a different
+        # precision was requested)
+        D = station.data
+
+        if station.synthetics is None:
+            S = [trace.data for trace in s]
+        else:
+            S = _pack(s, station.synthetics)
+
+        # time sampling scheme
+        npts = station.npts
+        dt = station.dt
+
+        padding_left = station.padding_left
+        padding_right = station.padding_right
+
+        value_station = 0.
+
+        # if no time shifts are allowed, there is nothing to search over, so
+        # the cross-correlation is needed only for trace attributes
+        search = padding_left!=0 or padding_right!=0 or set_attributes
+
+        for indices, weighted_indices in zip(
+            station.indices_by_group, station.weighted_indices_by_group):
+
+            # traces with zero weight do not contribute to misfit, so their
+            # residuals are needed only for trace attributes
+            if set_attributes:
+                residual_indices = indices
+            else:
+                residual_indices = weighted_indices
+
+            if len(residual_indices)==0:
+                continue
+
+            # Finds the time-shift between data and synthetics that yields
+            # the maximum cross-correlation value across all components in 
+            # a given group, subject to min/max constraints
+            if search:
+                corr = _correlate_group(station, S, indices)
+
+                npts_shift = corr.argmax() - padding_right
+            else:
+                npts_shift = 0
+
+            time_shift = npts_shift*dt
+
+            # what start and stop indices will correctly shift synthetics
+            # relative to data?
+            idx_start = padding_left - npts_shift
+            idx_stop = idx_start + npts
+
+            # substract data from shifted synthetics and sum the
+            # resulting residuals
+            group_values = _get_residual_norms(D, S, residual_indices,
+                idx_start, idx_stop, residual_norm, dt, station.work)
+
+            value_station += np.dot(
+                station.weights[residual_indices], group_values)
+
+            for _k, value in zip(residual_indices, group_values):
+
+                if set_attributes:
+                    if not hasattr(s[_k], 'attrs'):
+                        s[_k].attrs = AttribDict()
+
+                    #
+                    # waveform-related attributes
+                    #
+
+                    s[_k].attrs.norm = norm
+
+                    s[_k].attrs.misfit = value
+
+                    s[_k].attrs.idx_start = idx_start
+                    s[_k].attrs.idx_stop = idx_stop
+
+
+                    #
+                    # phase-related attributes
+                    #
+
+                    s[_k].attrs.cc_max = corr.max()
+
+                    # "static_shift" is an optional user-supplied
+                    # time shift applied during data processing
+
+                    try:
+                        static_shift = d[_k].attrs.static_shift
+                    except:
+                        static_shift = 0.
+
+                    s[_k].attrs.static_shift = static_shift
+
+
+                    # "time_shift" is the subsequent cross-correlation time shift 
+                    # applied during misfit evaluation
+
+                    s[_k].attrs.time_shift = time_shift
+
+                    Ns = np.dot(s[_k].data,s[_k].data)**0.5
+                    Nd = np.dot(d[_k].data,d[_k].data)**0.5
+
+                    if Ns*Nd > 0:
+                        max_cc = np.correlate(s[_k].data,d[_k].data,'valid').max()
+                        s[_k].attrs.normalized_cc_max = max_cc/(Ns*Nd)
+                    else:
+                        s[_k].attrs.normalized_cc_max = np.nan
+
+                    s[_k].attrs.time_shift_min = time_shift_min
+                    s[_k].attrs.time_shift_max = time_shift_max
+
+
+                    # "total_shift" is the total correction, or in other words
+                    # the sum of static and cross-correlation time shifts
+
+                    s[_k].attrs.total_shift = time_shift + static_shift
+
+
+                    #
+                    # amplitude-related attributes
+                    #
+
+                    s_max = s[_k].data[idx_start:idx_stop].max()
+                    d_max = d[_k].data.max()
+
+                    s[_k].attrs.amplitude_ratio = d_max/s_max
+                    s[_k].attrs.log_amplitude_ratio = np.log(d_max/s_max)
+
+        return value_station
+
+    #
+    # iterate over sources (FFTs are single-threaded, so at most nthreads
+    # threads are busy at any time)
+    #
+    with ThreadPoolExecutor(max_workers=nthreads) as executor:
+
+        if nthreads > 1:
+            map_stations = executor.map
+        else:
+            map_stations = map
+
+        for _i, source in enumerate(sources):
+
+            # optional progress message
+            msg_handle()
+
+            # iterate over stations
+            values[_i] = sum(map_stations(
+                misfit_station, repeat(source), range(len(data))))
+
+
+    if normalize:
+        values /= norm_data
+
+    return values
+
+
+
+#
+# setup utilities
+#
+
+def _prepare(stream, time_shift_groups, time_shift_min, time_shift_max,
+    dtype=np.float64):
+    # precomputes everything about a given station that does not depend on
+    # the source
+    station = AttribDict()
+
+    components = get_components(stream)
+    if not components:
+        return station
+
+    # time sampling scheme
+    npts, dt = get_time_sampling(stream)
+
+    station.npts = npts
+    station.dt = dt
+    station.padding_left = int(round(+time_shift_max/dt))
+    station.padding_right = int(round(-time_shift_min/dt))
+
+    # user-supplied data weights
+    station.weights = _get_weights(stream)
+
+    # which components belong to which time-shift group? (all traces in a
+    # group contribute to its time shift, but traces with zero weight do not
+    # contribute to misfit)
+    station.indices_by_group = []
+    station.weighted_indices_by_group = []
+    for group in time_shift_groups:
+        _, indices = list_intersect_with_indices(components, group)
+        if indices:
+            weighted = [_k for _k in indices if station.weights[_k]!=0.]
+            station.indices_by_group += [np.array(indices, dtype=np.int64)]
+            station.weighted_indices_by_group += [
+                np.array(weighted, dtype=np.int64)]
+
+    # numeric trace data as contiguous arrays (optionally, using
+    # single precision to reduce memory traffic)
+    npts_padding = station.padding_left + station.padding_right
+
+    station.data = _pack(stream,
+        np.empty((len(components), npts), dtype=dtype))
+
+    if np.dtype(dtype)==np.float64:
+        station.synthetics = None
+    else:
+        station.synthetics =\
+            np.empty((len(components), npts + npts_padding), dtype=dtype)
+
+    # work array for residuals
+    station.work = np.empty(npts)
+
+    # for short traces, time-domain correlation is usually faster; for long
+    # traces, frequency-domain correlation is faster
+    station.use_fft = prefer_fft(npts, npts + npts_padding)
+
+    if station.use_fft:
+        station.nfft = next_fast_len(2*npts + npts_padding - 1, real=True)
+    else:
+        station.nfft = None
+
+    # data transforms are needed only by the frequency-domain correlation,
+    # so are computed on first use
+    station.data_rfft = None
+
+    return station
+
+
+#
+# array utilities
+#
+
+def _pack(stream, array):
+    # collects numeric trace data in a previously allocated 2-D array
+    for _k, trace in enumerate(stream):
+        array[_k, :] = trace.data
+
+    return array
+
+
+def _get_weights(stream):
+    # user-supplied data weights
+    weights = np.ones(len(stream))
+
+    for _k, trace in enumerate(stream):
+        try:
+            weights[_k] = trace.weight
+        except:
+            pass
+
+    return weights
+
+
+#
+# cross-correlation utilities
+#
+
+def _get_data_rfft(station):
+    # Fourier transforms of all data traces, computed once per station (if
+    # two threads get here at the same time, both compute the same result)
+    if station.data_rfft is None:
+        station.data_rfft = rfft(station.data, n=station.nfft, axis=-1)
+
+    return station.data_rfft
+
+
+def _correlate_group(station, S, indices):
+    # cross-correlates data and synthetics, summing over all components in a
+    # time-shift group
+    D = station.data
+
+    npts_dat = station.npts
+    npts_syn = station.npts + station.padding_left + station.padding_right
+
+    if not station.use_fft:
+        corr = np.zeros(npts_syn-npts_dat+1)
+        for _k in indices:
+            corr += np.correlate(D[_k], S[_k], 'valid')
+        return corr
+
+    # by linearity, components can be summed before a single inverse
+    # transform, and only the synthetics need to be transformed here
+    nfft = station.nfft
+
+    d_hat = _get_data_rfft(station)
+
+    X = 0.
+    for _k in indices:
+        X = X + d_hat[_k]*rfft(S[_k][::-1], n=nfft)
+
+    return irfft(X, n=nfft)[npts_dat-1:npts_syn]
+
+
+#
+# residual utilities
+#
+
+def _get_residual_norms(D, S, indices, start, stop, residual_norm, dt, work):
+    # residual norm of each component in a time-shift group
+    group_values = np.zeros(len(indices))
+
+    for _n, _k in enumerate(indices):
+        group_values[_n] = residual_norm(S[_k], D[_k], start, stop, dt, work)
+
+    return group_values
+
+
+def _L1_norm(s, d, start, stop, dt, work):
+    return _sum_abs_diff(s, d, start, stop, work)*dt
+
+
+def _L2_norm(s, d, start, stop, dt, work):
+    return _sum_squared_diff(s, d, start, stop, work)*dt
+
+
+def _hybrid_norm(s, d, start, stop, dt, work):
+    return np.sqrt(_sum_squared_diff(s, d, start, stop, work))*dt
+
+
+# residual norms are looked up once per misfit evaluation, rather than once
+# per trace
+_residual_norms = {
+    'L1': _L1_norm,
+    'L2': _L2_norm,
+    'hybrid': _hybrid_norm,
+    }
+
+
+if exists_numba():
+    from numba import njit
+
+    # the following sum s[start:stop] - d in a single pass, without allocating
+    # temporary arrays (accumulating in double precision, regardless of input
+    # precision; the work array is needed only by the fallbacks)
+
+    @njit(cache=True, fastmath=True, nogil=True)
+    def _sum_abs_diff(s, d, start, stop, work):
+        acc = 0.
+        for k in range(stop-start):
+            acc += abs(float(s[start+k]) - float(d[k]))
+        return acc
+
+    @njit(cache=True, fastmath=True, nogil=True)
+    def _sum_squared_diff(s, d, start, stop, work):
+        acc = 0.
+        for k in range(stop-start):
+            r = float(s[start+k]) - float(d[k])
+            acc += r*r
+        return acc
+
+else:
+    # NumPy fallbacks used if Numba is not installed (these overwrite the
+    # given double precision work array rather than allocating temporary
+    # arrays, and avoid the generic power ufunc)
+
+    def _sum_abs_diff(s, d, start, stop, work):
+        np.subtract(s[start:stop], d, out=work, dtype=np.float64)
+        np.abs(work, out=work)
+        return work.sum()
+
+    def _sum_squared_diff(s, d, start, stop, work):
+        np.subtract(s[start:stop], d, out=work, dtype=np.float64)
+        return np.dot(work, work)
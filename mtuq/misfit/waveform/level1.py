@@ -6,7 +6,7 @@ See ``mtuq/misfit/waveform/__init__.py`` for more information
 
 import numpy as np
 from mtuq.misfit.waveform._stats import _flatten, calculate_norm_data
-from mtuq.util.math import correlate, isclose, list_intersect_with_indices
+from mtuq.util.math import correlate_batch, isclose, list_intersect_with_indices
 from mtuq.util.signal import get_components, get_time_sampling
 
 
@@ -32,7 +32,7 @@ def misfit(data, greens, sources, norm, time_shift_groups,
         greens[_j]._set_components(get_components(d))
 
         helpers += [Helper(data[_j], greens[_j], norm, 
-                           time_shift_min, time_shift_max)]
+                           time_shift_min, time_shift_max, time_shift_groups)]
 
     #
     # iterate over sources
@@ -52,18 +52,13 @@ def misfit(data, greens, sources, norm, time_shift_groups,
                 continue
 
             # time sampling scheme
-            npts, dt = get_time_sampling(d)
-            padding_left = int(+time_shift_max/dt)
-            padding_right = int(-time_shift_min/dt)
+            npts = helpers[_j].npts
+            dt = helpers[_j].dt
 
-
-            for group in time_shift_groups:
+            for indices in helpers[_j].indices_by_group:
                 # Finds the time-shift between data and synthetics that yields
                 # the maximum cross-correlation value across all components in 
                 # a given group, subject to min/max constraints
-                _, indices = list_intersect_with_indices(
-                    components, group)
-
                 ic = helpers[_j].get_time_shift(source, indices)
 
                 for _k in indices:
@@ -178,7 +173,8 @@ class Helper(object):
         return cc_sum.argmax()
 
 
-    def __init__(self, d, g, norm, time_shift_min, time_shift_max, debug=False):
+    def __init__(self, d, g, norm, time_shift_min, time_shift_max,
+        time_shift_groups, debug=False):
         """ 
         Computes auto- and cross-correlations between data and synthetics
         for use by the other two methods
@@ -193,6 +189,9 @@ class Helper(object):
 
         npts, dt = get_time_sampling(d)
 
+        self.npts = npts
+        self.dt = dt
+
         self.padding_left = int(round(+time_shift_max/dt))
         self.padding_right = int(round(-time_shift_min/dt))
         npts_padding = self.padding_left+self.padding_right
@@ -205,6 +204,13 @@ class Helper(object):
         self.source = None
         self.cc_sum = np.zeros(npts_padding+1)
 
+        # which components belong to which time-shift group? (resolved once
+        # here, rather than for every source)
+        self.indices_by_group = []
+        for group in time_shift_groups:
+            _, indices = list_intersect_with_indices(components, group)
+            self.indices_by_group += [indices]
+
 
         #
         # correlate greens and data
@@ -215,9 +221,9 @@ class Helper(object):
         for _i, component in enumerate(g.components):
             trace = d.select(component=component)[0]
 
-            for _j in range(ngreens):
-                corr[_i, _j, :] =\
-                    correlate(greens[_i, _j, :], trace.data)
+            # correlates all Green's functions at once
+            corr[_i, :, :] =\
+                correlate_batch(greens[_i, :, :], trace.data[np.newaxis, :])
 
         self.g_d = corr
 
@@ -241,19 +247,19 @@ class Helper(object):
         ones = np.pad(np.ones(npts-npts_padding), npts_padding, 'constant')
         corr = np.zeros((ncomp, npts_padding+1, ngreens, ngreens))
 
+        # indices of upper elements
+        _j1, _j2 = np.triu_indices(ngreens)
+
         # the main work starts now
         for _i in range(ncomp):
-            for _j1 in range(ngreens):
-                for _j2 in range(ngreens):
+            # calculate upper elements
+            upper = correlate_batch(
+                greens[_i, _j1, :]*greens[_i, _j2, :], ones[np.newaxis, :])
 
-                    if _j1<=_j2:
-                        # calculate upper elements
-                        corr[_i, :, _j1, _j2] = correlate(
-                            greens[_i, _j1, :]*greens[_i, _j2, :], ones)
+            corr[_i][:, _j1, _j2] = upper.T
 
-                    else:
-                        # fill in lower elements by symmetry
-                        corr[_i, :, _j1, _j2] = corr[_i, :, _j2, _j1]
+            # fill in lower elements by symmetry
+            corr[_i][:, _j2, _j1] = upper.T
 
         self.g_g  = corr
 
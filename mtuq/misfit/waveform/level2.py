@@ -8,8 +8,7 @@ import numpy as np
 import time
 from copy import deepcopy
 from mtuq.misfit.waveform._stats import _flatten, calculate_norm_data
-from mtuq.misfit.waveform.level1 import correlate
-from mtuq.util.math import to_mij, to_rtp
+from mtuq.util.math import correlate_batch, to_mij_batch, to_rtp
 from mtuq.util.signal import get_components, get_time_sampling
 from mtuq.misfit.waveform import c_ext_L2
 
@@ -296,7 +295,7 @@ def _to_array(sources):
     df = sources.to_dataframe()
 
     if _type(dims)=='MomentTensor':
-        return np.ascontiguousarray(to_mij(
+        return np.ascontiguousarray(to_mij_batch(
             df['rho'].to_numpy(),
             df['v'].to_numpy(),
             df['w'].to_numpy(),
@@ -349,11 +348,9 @@ def _corr_1_2(data, greens, padding):
         ))
 
     for _i in range(Nstations):
-        for _j in range(Ncomponents):
-            for _k in range(Ngreens):
-
-                corr[_i, _j, _k, :] = correlate(
-                    greens[_i, _j, _k, :], data[_i, _j, :])
+        # correlates all components and Green's functions at once
+        corr[_i, :, :, :] = correlate_batch(
+            greens[_i, :, :, :], data[_i, :, np.newaxis, :])
 
     return corr
 
@@ -395,18 +392,19 @@ def _autocorr_2(greens, padding):
         Ngreens,
         ))
 
+    # indices of upper elements
+    _k1, _k2 = np.triu_indices(Ngreens)
+
     for _i in range(Nstations):
-        for _j in range(Ncomponents):
-            for _k1 in range(Ngreens):
-                for _k2 in range(Ngreens):
+        # correlates all components and upper elements at once
+        upper = correlate_batch(
+            greens[_i][:, _k1, :]*greens[_i][:, _k2, :],
+            ones[np.newaxis, np.newaxis, :])
 
-                    if _k1<=_k2:
-                        corr[_i, _j, :, _k1, _k2] = correlate(
-                            greens[_i, _j, _k1, :]*greens[_i, _j, _k2, :],
-                            ones)
+        corr[_i][:, :, _k1, _k2] = upper.swapaxes(1, 2)
 
-                    else:
-                        corr[_i, _j, :, _k1, _k2] = corr[_i, _j, :, _k2, _k1]
+        # fill in lower elements by symmetry
+        corr[_i][:, :, _k2, _k1] = upper.swapaxes(1, 2)
 
     return corr
 
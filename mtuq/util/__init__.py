@@ -87,6 +87,14 @@ def gather2(comm, array):
         return
 
 
+def exists_numba():
+    try:
+        import numba
+        return True
+    except:
+        return False
+
+
 def is_mpi_env():
     try:
         import mpi4py
@@ -1,19 +1,24 @@
 
 import numpy as np
+from functools import lru_cache
 from obspy.geodetics import gps2dist_azimuth
-from scipy.signal import fftconvolve
+from scipy.fft import irfft, next_fast_len, rfft
+from mtuq.util import exists_numba
 
 
 #
 # numerical
 #
 
-def isclose(X, Y):
-    EPSVAL = 1.e-6
-    X = np.array(X)
-    Y = np.array(Y)
+def isclose(X, Y, eps=1.e-6):
+    """ Checks whether the Euclidean distance between X and Y is less than eps
+    """
+    if np.isscalar(X) and np.isscalar(Y):
+        return bool(abs(X-Y) < eps)
+
+    D = np.subtract(X, Y).ravel()
     return bool(
-        np.linalg.norm(X-Y) < EPSVAL)
+        np.dot(D, D) < eps*eps)
 
 
 def correlate(v1, v2):
@@ -24,14 +29,69 @@ def correlate(v1, v2):
     """
     n1, n2 = len(v1), len(v2)
 
-    if n1>2000 or n2-n1>200:
+    if prefer_fft(n1, n2):
         # for long traces, frequency-domain implementation is usually faster
-        return fftconvolve(v1, v2[::-1], 'valid')
+        return correlate_batch(v1, v2)
     else:
         # for short traces, time-domain implementation is usually faster
         return np.correlate(v1, v2, 'valid')
 
 
+def prefer_fft(n1, n2):
+    """ Checks whether cross-correlating unpadded and padded arrays of lengths
+    n1 and n2 is likely faster in the frequency domain than in the time domain
+    """
+    return n1>2000 or n2-n1>200
+
+
+def correlate_batch(V1, V2, axis=-1, workers=None):
+    """ Batched cross-correlation function
+
+    Correlates arrays V1 and V2 along the given axis, broadcasting over all
+    other axes.  Equivalent to calling ``correlate`` on each pair of 1-D
+    slices, but for long arrays, uses a single frequency-domain operation
+    without the Python overhead
+
+    V1 and V2 must have the same number of dimensions
+
+    ``workers`` is passed to ``scipy.fft`` and defaults to a single thread,
+    since MTUQ usually runs one MPI process per core
+    """
+    n1, n2 = np.shape(V1)[axis], np.shape(V2)[axis]
+
+    if not prefer_fft(min(n1, n2), max(n1, n2)):
+        # for short arrays, time-domain implementation is usually faster
+        return _correlate_batch_direct(V1, V2, axis)
+
+    # real-to-complex transforms of a fast length
+    nfft = next_fast_len(n1 + n2 - 1, real=True)
+
+    X = rfft(V1, n=nfft, axis=axis, workers=workers) *\
+        rfft(np.flip(V2, axis=axis), n=nfft, axis=axis, workers=workers)
+
+    # keep only the samples that do not depend on zero padding
+    corr = irfft(X, n=nfft, axis=axis, workers=workers)
+    return np.take(corr, range(min(n1, n2)-1, max(n1, n2)), axis=axis)
+
+
+def _correlate_batch_direct(V1, V2, axis):
+    # time-domain version of correlate_batch, which loops over 1-D slices
+    V1 = np.moveaxis(np.asarray(V1), axis, -1)
+    V2 = np.moveaxis(np.asarray(V2), axis, -1)
+
+    n1, n2 = V1.shape[-1], V2.shape[-1]
+
+    shape = np.broadcast_shapes(V1.shape[:-1], V2.shape[:-1])
+    V1 = np.broadcast_to(V1, shape + (n1,))
+    V2 = np.broadcast_to(V2, shape + (n2,))
+
+    corr = np.empty(shape + (abs(n1-n2)+1,), dtype=np.result_type(V1, V2))
+    for index in np.ndindex(shape):
+        corr[index] = np.correlate(V1[index], V2[index], 'valid')
+
+    return np.moveaxis(corr, -1, axis)
+
+
 def wrap_180(angle_in_deg):
     """ Wraps angle to (-180, 180)
     """
@@ -87,18 +147,33 @@ def list_intersect_with_indices(a, b):
 
 def open_interval(x1, x2, N):
     """ Covers the open interval (x1, x2) with N regularly-spaced points
+
+    Returns a read-only view of a cached array (make a copy before modifying)
     """
 
     # NOTE: np.linspace(x1, x2, N)[1:-1] would be slightly simpler
     # but not as readily used by matplotlib.pyplot.pcolor
 
-    return np.linspace(x1, x2, 2*N+1)[1:-1:2]
+    return _cached_linspace(float(x1), float(x2), 2*int(N)+1)[1:-1:2]
 
 
 def closed_interval(x1, x2, N):
     """ Covers the closed interval [x1, x2] with N regularly-spaced points
+
+    Returns a read-only view of a cached array (make a copy before modifying)
     """
-    return np.linspace(x1, x2, N)
+    return _cached_linspace(float(x1), float(x2), int(N)).view()
+
+
+@lru_cache(maxsize=256)
+def _cached_linspace(x1, x2, N):
+    # the same intervals are requested repeatedly during grid construction
+    # and plotting, so the arrays are cached and made read-only to protect
+    # the cache from modification (arguments must be hashable, so callers
+    # convert them to Python numbers first)
+    array = np.linspace(x1, x2, N)
+    array.flags.writeable = False
+    return array
 
 
 def tight_interval(x1,x2,N,tightness=0.999):
@@ -126,6 +201,36 @@ def to_mij(rho, v, w, kappa, sigma, h):
     """ Converts from lune parameters to moment tensor parameters
     (up-south-east convention)
     """
+    mt = _to_mij(rho, _to_beta(w), _to_gamma(v), kappa, sigma, h)
+
+    if type(mt[0]) is np.ndarray:
+        return np.column_stack(mt)
+    else:
+        return np.array(mt)
+
+
+def to_mij_batch(rho, v, w, kappa, sigma, h):
+    """ Converts arrays of lune parameters to moment tensor parameters
+    (up-south-east convention)
+
+    Returns a NumPy array of shape ``(N, 6)``. If Numba is installed, the
+    conversion runs as a compiled kernel in parallel over grid points;
+    otherwise, falls back to ``to_mij``
+    """
+    args = [np.ascontiguousarray(arg, dtype=np.float64).ravel()
+        for arg in (rho, v, w, kappa, sigma, h)]
+
+    if _to_mij_batch is None:
+        return to_mij(*args)
+
+    return _to_mij_batch(*args)
+
+
+def _to_mij(rho, beta, gamma, kappa, sigma, h):
+    # formulas used by both `to_mij` and `to_mij_batch` (lune colatitude beta
+    # and longitude gamma in radians); arguments can be scalars or NumPy
+    # arrays, and if Numba is installed, this function also gets compiled for
+    # use on individual grid points
     kR3 = np.sqrt(3.)
     k2R6 = 2.*np.sqrt(6.)
     k2R3 = 2.*np.sqrt(3.)
@@ -134,11 +239,6 @@ def to_mij(rho, v, w, kappa, sigma, h):
 
     m0 = rho/np.sqrt(2.)
 
-    delta, gamma = to_delta_gamma(v, w)
-    beta = 90. - delta
-
-    gamma = np.deg2rad(gamma)
-    beta = np.deg2rad(90. - delta)
     kappa = np.deg2rad(kappa)
     sigma = np.deg2rad(sigma)
     theta = np.arccos(h)
@@ -182,10 +282,49 @@ def to_mij(rho, v, w, kappa, sigma, h):
     mt5 = -m0* (1./8.)*Sb*(4.*Cg*(2.*C2k*Cs*St + S2t*S2k*Ss) +
         kR3*Sg*((1. - 2.*C2t*Cs*Cs - 3.*C2s)*S2k + 4.*Ct*C2k*S2s))
 
-    if type(mt0) is np.ndarray:
-        return np.column_stack([mt0, mt1, mt2, mt3, mt4, mt5])
-    else:
-        return np.array([mt0, mt1, mt2, mt3, mt4, mt5])
+    return mt0, mt1, mt2, mt3, mt4, mt5
+
+
+# lookup table used to convert from Tape2015 parameter w to lune colatitude
+_BETA0 = np.linspace(0, np.pi, 100)
+_U0 = 0.75*_BETA0 - 0.5*np.sin(2.*_BETA0) + 0.0625*np.sin(4.*_BETA0)
+
+
+def _to_beta(w):
+    # lune colatitude (radians) from Tape2015 parameter w
+    return np.interp(3.*np.pi/8. - w, _U0, _BETA0)
+
+
+def _to_gamma(v):
+    # lune longitude (radians) from Tape2015 parameter v
+    return (1./3.)*np.arcsin(3.*v)
+
+
+if exists_numba():
+    from numba import njit, prange
+
+    # compiled versions of the same functions used by `to_mij`
+    _to_beta_kernel = njit(cache=True)(_to_beta)
+    _to_gamma_kernel = njit(cache=True)(_to_gamma)
+    _to_mij_kernel = njit(cache=True, fastmath=True)(_to_mij)
+
+    @njit(cache=True, parallel=True)
+    def _to_mij_batch(rho, v, w, kappa, sigma, h):
+        out = np.empty((rho.size, 6))
+        for _i in prange(rho.size):
+            mt0, mt1, mt2, mt3, mt4, mt5 = _to_mij_kernel(rho[_i],
+                _to_beta_kernel(w[_i]), _to_gamma_kernel(v[_i]),
+                kappa[_i], sigma[_i], h[_i])
+            out[_i, 0] = mt0
+            out[_i, 1] = mt1
+            out[_i, 2] = mt2
+            out[_i, 3] = mt3
+            out[_i, 4] = mt4
+            out[_i, 5] = mt5
+        return out
+
+else:
+    _to_mij_batch = None
 
 
 def to_xyz(F0, phi, h):
@@ -242,16 +381,14 @@ def to_delta_gamma(v, w):
 def to_gamma(v):
     """ Converts from Tape2015 parameter v to lune longitude
     """
-    gamma = (1./3.)*np.arcsin(3.*v)
+    gamma = _to_gamma(v)
     return np.rad2deg(gamma)
 
 
 def to_delta(w):
     """ Converts from Tape2015 parameter w to lune latitude
     """
-    beta0 = np.linspace(0, np.pi, 100)
-    u0 = 0.75*beta0 - 0.5*np.sin(2.*beta0) + 0.0625*np.sin(4.*beta0)
-    beta = np.interp(3.*np.pi/8. - w, u0, beta0)
+    beta = _to_beta(w)
     delta = np.rad2deg(np.pi/2. - beta)
     return delta
 
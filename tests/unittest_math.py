@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+
+import unittest
+import numpy as np
+
+import mtuq.util.math
+from mtuq.util import exists_numba
+from mtuq.util.math import closed_interval, correlate, correlate_batch,\
+    open_interval, to_mij, to_mij_batch
+
+
+EPSVAL = 1.e-10
+
+def _is_close(a, b):
+    if np.shape(a)==np.shape(b) and np.allclose(a, b, rtol=0., atol=EPSVAL):
+        return True
+    else:
+        print('Error:', np.abs(np.subtract(a, b)).max())
+        return False
+
+
+class TestCorrelate(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+
+    def test_correlate_short(self):
+        v1 = self.rng.standard_normal(500)
+        v2 = self.rng.standard_normal(550)
+        assert _is_close(correlate(v1, v2), np.correlate(v1, v2, 'valid'))
+
+
+    def test_correlate_long(self):
+        v1 = self.rng.standard_normal(3000)
+        v2 = self.rng.standard_normal(3300)
+        assert _is_close(correlate(v1, v2), np.correlate(v1, v2, 'valid'))
+
+
+    def test_correlate_batch_n1_less_than_n2(self):
+        v1 = self.rng.standard_normal(400)
+        v2 = self.rng.standard_normal(450)
+        assert _is_close(correlate_batch(v1, v2), np.correlate(v1, v2, 'valid'))
+
+
+    def test_correlate_batch_n1_greater_than_n2(self):
+        v1 = self.rng.standard_normal(450)
+        v2 = self.rng.standard_normal(400)
+        assert _is_close(correlate_batch(v1, v2), np.correlate(v1, v2, 'valid'))
+
+
+    def test_correlate_batch_broadcasting(self):
+        # many Green's functions against one data trace, as in level1
+        V1 = self.rng.standard_normal((6, 350))
+        V2 = self.rng.standard_normal((1, 300))
+        expected = np.array([np.correlate(v1, V2[0], 'valid') for v1 in V1])
+        assert _is_close(correlate_batch(V1, V2), expected)
+
+
+    def test_correlate_batch_shapes(self):
+        # pairwise correlation of stacked arrays, as in level2
+        V1 = self.rng.standard_normal((2, 3, 300))
+        V2 = self.rng.standard_normal((2, 3, 320))
+        expected = np.empty((2, 3, 21))
+        for _i in range(2):
+            for _j in range(3):
+                expected[_i, _j] = np.correlate(V1[_i, _j], V2[_i, _j], 'valid')
+        assert _is_close(correlate_batch(V1, V2), expected)
+
+
+    def test_correlate_batch_axis(self):
+        V1 = self.rng.standard_normal((300, 4))
+        V2 = self.rng.standard_normal((310, 4))
+        expected = np.column_stack([
+            np.correlate(V1[:, _j], V2[:, _j], 'valid') for _j in range(4)])
+        assert _is_close(correlate_batch(V1, V2, axis=0), expected)
+
+
+    def test_correlate_batch_long(self):
+        # frequency-domain branch, with broadcasting and a non-default axis
+        V1 = self.rng.standard_normal((2500, 1, 3))
+        V2 = self.rng.standard_normal((2540, 2, 1))
+        expected = np.empty((41, 2, 3))
+        for _i in range(2):
+            for _j in range(3):
+                expected[:, _i, _j] = np.correlate(
+                    V1[:, 0, _j], V2[:, _i, 0], 'valid')
+        assert _is_close(correlate_batch(V1, V2, axis=0), expected)
+
+
+class TestIntervals(unittest.TestCase):
+
+    def test_values(self):
+        assert _is_close(closed_interval(0., 1., 5), np.linspace(0., 1., 5))
+        assert _is_close(open_interval(0., 1., 4),
+            np.array([0.125, 0.375, 0.625, 0.875]))
+
+
+    def test_array_arguments(self):
+        # NumPy scalars and 0-d arrays work as well as Python numbers
+        assert _is_close(closed_interval(np.array(0.), 1., np.int64(5)),
+            closed_interval(0., 1., 5))
+        assert _is_close(open_interval(np.float32(0.), np.array(1.), 4),
+            open_interval(0., 1., 4))
+
+
+    def test_read_only(self):
+        # cached arrays are shared between calls, so cannot be modified
+        for array in [closed_interval(0., 1., 5), open_interval(0., 1., 4)]:
+            with self.assertRaises(ValueError):
+                array[0] = 1.
+
+        # copies can be modified without affecting later calls
+        array = closed_interval(0., 1., 5).copy()
+        array[0] = 1.
+        assert closed_interval(0., 1., 5)[0]==0.
+
+
+    def test_cached(self):
+        assert np.shares_memory(
+            closed_interval(-1., 1., 7), closed_interval(-1, 1, 7))
+
+
+class TestToMij(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        npts = 1000
+
+        self.args = [
+            rng.uniform(1.e15, 1.e17, npts),
+            rng.uniform(-1./3., 1./3., npts),
+            rng.uniform(-3./8.*np.pi, 3./8.*np.pi, npts),
+            rng.uniform(0., 360., npts),
+            rng.uniform(-90., 90., npts),
+            rng.uniform(0., 1., npts),
+            ]
+
+
+    def _check(self):
+        expected = to_mij(*self.args)
+        result = to_mij_batch(*self.args)
+
+        assert result.shape==expected.shape
+        assert np.allclose(result, expected,
+            rtol=0., atol=1.e-12*np.abs(expected).max())
+
+
+    @unittest.skipIf(not exists_numba(), 'Numba not installed')
+    def test_to_mij_batch_numba(self):
+        assert mtuq.util.math._to_mij_batch is not None
+        self._check()
+
+
+    def test_to_mij_batch_fallback(self):
+        # falls back to `to_mij` as if Numba were not installed
+        _to_mij_batch = mtuq.util.math._to_mij_batch
+        try:
+            mtuq.util.math._to_mij_batch = None
+            self._check()
+        finally:
+            mtuq.util.math._to_mij_batch = _to_mij_batch
+
+
+    def test_to_mij_scalar(self):
+        args = [arg[0] for arg in self.args]
+        assert np.allclose(to_mij(*args), to_mij_batch(*args)[0])
+
+
+if __name__=='__main__':
+    unittest.main()
+
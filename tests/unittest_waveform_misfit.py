@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+
+
+import unittest
+import numpy as np
+
+from obspy.core import Stream, Trace
+from mtuq.event import MomentTensor, Origin
+from mtuq.greens_tensor.base import GreensTensor
+from mtuq.misfit.waveform import level0, level0_fast, level1
+from mtuq.station import Station
+from mtuq.util import Null
+
+
+class _GreensTensor(GreensTensor):
+    """ Minimal Green's tensor for testing, in which each component is a
+    scaled copy of the six underlying time series
+    """
+    def _precompute(self):
+        scale = {'Z': 1., 'R': -0.5, 'T': 0.8}
+        for _i, component in enumerate(self.components):
+            for _j in range(6):
+                self._array[_i, _j, :] = scale[component]*self[_j].data
+
+
+def _get_data_and_greens(nstations=3, npts=500, npts_padding=40, dt=0.05,
+    seed=0):
+    """ Random data and Green's functions
+    """
+    rng = np.random.default_rng(seed)
+
+    origin = Origin({
+        'latitude': 0.,
+        'longitude': 0.,
+        'depth_in_m': 10000.,
+        })
+
+    data, greens = [], []
+    for _i in range(nstations):
+        station = Station({
+            'latitude': 1.,
+            'longitude': 1.+_i,
+            'network': 'XX',
+            'station': 'S%d' % _i,
+            'id': 'XX.S%d.' % _i,
+            })
+
+        data += [Stream([
+            Trace(rng.standard_normal(npts),
+                {'channel': 'BH'+component, 'delta': dt})
+            for component in ['Z', 'R', 'T']])]
+
+        greens += [_GreensTensor([
+            Trace(rng.standard_normal(npts + npts_padding), {'delta': dt})
+            for _ in range(6)], station=station, origin=origin)]
+
+    sources = [MomentTensor(rng.standard_normal(6)) for _ in range(5)]
+
+    return data, greens, sources
+
+
+class TestLevel0Fast(unittest.TestCase):
+
+    def _misfit(self, module, data, greens, sources, norm, **kwargs):
+        return module.misfit(data, greens, sources, norm, ['ZR', 'T'],
+            -1., 1., Null(), **kwargs)
+
+
+    def _check_options(self, npts):
+        # compares against level0, which correlates and sums residuals
+        # trace by trace with plain NumPy
+        data, greens, sources = _get_data_and_greens(npts=npts)
+
+        for norm in ['L1', 'L2', 'hybrid']:
+            expected = self._misfit(level0, data, greens, sources, norm)
+
+            result = self._misfit(level0_fast, data, greens, sources, norm)
+            assert np.allclose(result, expected, rtol=1.e-12)
+
+            result = self._misfit(level0_fast, data, greens, sources, norm,
+                nthreads=4)
+            assert np.allclose(result, expected, rtol=1.e-12)
+
+            result = self._misfit(level0_fast, data, greens, sources, norm,
+                dtype=np.float32)
+            assert np.allclose(result, expected, rtol=1.e-5)
+
+
+    def test_options_short_traces(self):
+        # time-domain cross-correlation
+        self._check_options(npts=500)
+
+
+    def test_options_long_traces(self):
+        # frequency-domain cross-correlation
+        self._check_options(npts=3000)
+
+
+class TestLongTraces(unittest.TestCase):
+    """ Checks frequency-domain cross-correlation (used for long traces) with
+    asymmetric time-shift bounds, so that an off-by-one time shift would be
+    detected
+    """
+    def _check(self, modules, norms):
+        data, greens, sources = _get_data_and_greens(npts=3000)
+
+        for norm in norms:
+            for groups in [['ZRT'], ['ZR', 'T']]:
+                expected = level0.misfit(data, greens, sources, norm, groups,
+                    -0.5, 1.5, Null())
+
+                for module in modules:
+                    result = module.misfit(data, greens, sources, norm, groups,
+                        -0.5, 1.5, Null())
+                    assert np.allclose(result, expected, rtol=1.e-6)
+
+
+    def test_level0_fast(self):
+        self._check([level0_fast], ['L1', 'L2', 'hybrid'])
+
+
+    def test_level1(self):
+        self._check([level1], ['L2', 'hybrid'])
+
+
+class TestZeroWeights(unittest.TestCase):
+
+    def test_level0_level1(self):
+        # traces with zero weight do not contribute to misfit, but do
+        # contribute to time shifts, in all implementations
+        data, greens, sources = _get_data_and_greens()
+
+        for stream in data:
+            for trace in stream:
+                trace.weight = 1.
+        data[0][0].weight = 0.
+        data[1][2].weight = 0.
+
+        for norm in ['L2', 'hybrid']:
+            for groups in [['ZRT'], ['ZR', 'T'], ['Z', 'R', 'T']]:
+                values0 = level0.misfit(data, greens, sources, norm, groups,
+                    -1., 1., Null())
+
+                values0_fast = level0_fast.misfit(data, greens, sources, norm,
+                    groups, -1., 1., Null())
+
+                values1 = level1.misfit(data, greens, sources, norm, groups,
+                    -1., 1., Null())
+
+                assert np.allclose(values0_fast, values0, rtol=1.e-12)
+                assert np.allclose(values1, values0, rtol=1.e-6)
+
+
+if __name__=='__main__':
+    unittest.main()
+